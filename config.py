@@ -4,20 +4,39 @@ Uses GPT-4o Realtime API for direct audio-to-audio processing
 Supports both OpenAI and Azure OpenAI
 """
 import os
+from dataclasses import dataclass
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 
 # Load environment variables
-load_dotenv()
+# Prefer env_compiled.py (generated by scripts/compile_env.py) so startup is a
+# cached bytecode import instead of a .env parse. Real environment variables
+# still win, matching load_dotenv()'s default of not overriding them.
+try:
+    from env_compiled import ENV as _COMPILED_ENV
+except ImportError:
+    _COMPILED_ENV = None
+    # Parsed once per process; the flag survives importlib.reload(config)
+    # because reload re-executes in the same namespace
+    if not globals().get("_DOTENV_LOADED", False):
+        load_dotenv()
+        _DOTENV_LOADED = True
+
+# Snapshot the environment once so each setting below is a plain dict lookup
+_ENV = {**_COMPILED_ENV, **os.environ} if _COMPILED_ENV else dict(os.environ)
+
+# Accepted spellings for boolean flags (membership test, no .lower() copy)
+_TRUTHY = frozenset({"true", "True", "TRUE", "1", "yes", "Yes", "YES", "on", "On", "ON"})
 
 # =============================================================================
 # Provider Selection: Set USE_AZURE=true in .env to use Azure OpenAI
 # =============================================================================
-USE_AZURE = os.getenv("USE_AZURE", "false").lower() == "true"
+USE_AZURE = _ENV.get("USE_AZURE", "") in _TRUTHY
 
 # =============================================================================
 # OpenAI Configuration (used when USE_AZURE=false)
 # =============================================================================
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_API_KEY = _ENV.get("OPENAI_API_KEY")
 REALTIME_MODEL = "gpt-4o-realtime-preview-2024-12-17"
 REALTIME_WS_URL = "wss://api.openai.com/v1/realtime"
 
@@ -25,15 +44,15 @@ REALTIME_WS_URL = "wss://api.openai.com/v1/realtime"
 # Azure OpenAI Configuration (used when USE_AZURE=true)
 # =============================================================================
 # Strip quotes from environment variables (Azure Container Apps sometimes adds them)
+_QUOTE_CHARS = "\"'"
+
 def _strip_quotes(value):
-    if value:
-        return value.strip('"\'')
-    return value
+    return value.strip(_QUOTE_CHARS) if value else value
 
-AZURE_OPENAI_ENDPOINT = _strip_quotes(os.getenv("AZURE_OPENAI_ENDPOINT"))  # e.g., https://your-resource.openai.azure.com
-AZURE_OPENAI_API_KEY = _strip_quotes(os.getenv("AZURE_OPENAI_API_KEY"))
-AZURE_OPENAI_DEPLOYMENT = _strip_quotes(os.getenv("AZURE_OPENAI_DEPLOYMENT"))  # Your deployment name
-AZURE_API_VERSION = _strip_quotes(os.getenv("AZURE_API_VERSION", "2024-10-01-preview"))
+AZURE_OPENAI_ENDPOINT = _strip_quotes(_ENV.get("AZURE_OPENAI_ENDPOINT"))  # e.g., https://your-resource.openai.azure.com
+AZURE_OPENAI_API_KEY = _strip_quotes(_ENV.get("AZURE_OPENAI_API_KEY"))
+AZURE_OPENAI_DEPLOYMENT = _strip_quotes(_ENV.get("AZURE_OPENAI_DEPLOYMENT"))  # Your deployment name
+AZURE_API_VERSION = _strip_quotes(_ENV.get("AZURE_API_VERSION", "2024-10-01-preview"))
 
 # Audio Settings (GPT-4o Realtime API uses 24kHz PCM16)
 SAMPLE_RATE = 24000  # 24kHz required by GPT-4o Realtime API
@@ -42,6 +61,7 @@ CHANNELS = 1
 
 # Voice Settings
 VOICE = "alloy"  # Options: alloy, echo, shimmer, ash, ballad, coral, sage, verse
+VOICE_OPTIONS = ("alloy", "echo", "shimmer", "ash", "ballad", "coral", "sage", "verse")
 VOICE_SPEED = 1.0
 
 # Session Settings
@@ -60,34 +80,94 @@ TURN_DETECTION_PREFIX_PADDING_MS = 200  # Reduced to avoid capturing noise befor
 TURN_DETECTION_SILENCE_DURATION_MS = 700  # Increased to wait longer before responding
 
 # Performance Settings
-AUDIO_CHUNK_SIZE = 8192
-AUDIO_QUEUE_MAXSIZE = 500
+# Browser frames are 20ms (480 samples = 960 bytes of PCM16 at 24kHz). Keep
+# AUDIO_CHUNK_SIZE a whole number of frames so chunks never split a frame:
+#   AUDIO_CHUNK_SIZE % AUDIO_FRAME_BYTES == 0
+AUDIO_FRAME_BYTES = SAMPLE_RATE // 50 * 2
+AUDIO_CHUNK_SIZE = 9600  # 200ms (10 frames) of 24kHz mono PCM16
+AUDIO_QUEUE_MAXSIZE = 500  # Browser audio chunks buffered for OpenAI before the oldest are dropped
+AUDIO_BATCH_MS = 40  # Coalesce browser audio for up to this long per upstream send
 
 # Server Settings
 # Use 0.0.0.0 for Docker, localhost for local development
 # Both HTTP and WebSocket use the same port (8080) for Azure Container Apps compatibility
-HOST = os.getenv("HOST", "localhost")
-PORT = int(os.getenv("PORT", "8080"))  # Single port for both HTTP and WebSocket
+HOST = _ENV.get("HOST", "localhost")
+PORT = int(_ENV.get("PORT", "8080"))  # Single port for both HTTP and WebSocket
 HTTP_PORT = PORT
 WS_PORT = PORT
 
 # Recording Settings
 # Set ENABLE_RECORDINGS=true in .env to save audio recordings
-ENABLE_RECORDINGS = os.getenv("ENABLE_RECORDINGS", "false").lower() == "true"
+ENABLE_RECORDINGS = _ENV.get("ENABLE_RECORDINGS", "") in _TRUTHY
 
 # Debug Settings
 DEBUG = True
 VERBOSE = False
 
+# =============================================================================
+# Hot-path settings
+# =============================================================================
+# Frozen, slotted snapshot of the settings read per audio frame / per event.
+# Attribute access is a fixed slot offset instead of a module __dict__ lookup.
+# CONFIG is taken once at import time, so later reassignments of the
+# module-level names above (e.g. DEBUG, ENABLE_RECORDINGS) do not reach it.
+@dataclass(frozen=True, slots=True)
+class _Cfg:
+    sample_rate: int
+    audio_format: str
+    channels: int
+    frame_bytes: int
+    chunk_size: int
+    queue_maxsize: int
+    audio_batch_ms: int
+    enable_recordings: bool
+    debug: bool
+    verbose: bool
+
+CONFIG = _Cfg(
+    sample_rate=SAMPLE_RATE,
+    audio_format=AUDIO_FORMAT,
+    channels=CHANNELS,
+    frame_bytes=AUDIO_FRAME_BYTES,
+    chunk_size=AUDIO_CHUNK_SIZE,
+    queue_maxsize=AUDIO_QUEUE_MAXSIZE,
+    audio_batch_ms=AUDIO_BATCH_MS,
+    enable_recordings=ENABLE_RECORDINGS,
+    debug=DEBUG,
+    verbose=VERBOSE,
+)
+
 # Validate API keys
 def validate_config():
-    """Validate that required API keys are set"""
+    """Validate that required API keys are set and settings are in range"""
     errors = []
     
+    # Cheap sanity checks so bad settings fail here instead of as a
+    # websocket timeout or API error after connecting
+    if SAMPLE_RATE != 24000:
+        errors.append(f"SAMPLE_RATE must be 24000 (got {SAMPLE_RATE})")
+    if VOICE not in VOICE_OPTIONS:
+        errors.append(f"VOICE must be one of {', '.join(VOICE_OPTIONS)} (got {VOICE!r})")
+    if not 0.0 <= TURN_DETECTION_THRESHOLD <= 1.0:
+        errors.append(f"TURN_DETECTION_THRESHOLD must be 0.0-1.0 (got {TURN_DETECTION_THRESHOLD})")
+    if not 1 <= PORT <= 65535:
+        errors.append(f"PORT must be 1-65535 (got {PORT})")
+    if AUDIO_CHUNK_SIZE <= 0 or AUDIO_CHUNK_SIZE % AUDIO_FRAME_BYTES:
+        errors.append(
+            f"AUDIO_CHUNK_SIZE must be a positive multiple of {AUDIO_FRAME_BYTES} bytes "
+            f"(20ms frame, got {AUDIO_CHUNK_SIZE})"
+        )
+    
     if USE_AZURE:
         # Azure OpenAI validation
         if not AZURE_OPENAI_ENDPOINT:
             errors.append("AZURE_OPENAI_ENDPOINT not set")
+        else:
+            endpoint = urlparse(AZURE_OPENAI_ENDPOINT)
+            if AZURE_OPENAI_ENDPOINT != AZURE_OPENAI_ENDPOINT.strip():
+                errors.append("AZURE_OPENAI_ENDPOINT has leading/trailing whitespace")
+            elif endpoint.scheme != "https" or not endpoint.netloc:
+                errors.append(f"AZURE_OPENAI_ENDPOINT must be an https:// URL (got {AZURE_OPENAI_ENDPOINT!r})")
         if not AZURE_OPENAI_API_KEY:
             errors.append("AZURE_OPENAI_API_KEY not set")
         if not AZURE_OPENAI_DEPLOYMENT:
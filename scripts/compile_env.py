@@ -0,0 +1,47 @@
+"""
+Compile .env into env_compiled.py so config.py can import the values
+instead of parsing the .env file on every startup.
+
+Usage:
+    python scripts/compile_env.py [path/to/.env]
+
+Re-run this whenever .env changes. The generated module contains secrets,
+so it is git-ignored and excluded from the Docker build context.
+"""
+import sys
+from pathlib import Path
+from dotenv import dotenv_values
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+OUTPUT_FILE = ROOT_DIR / "env_compiled.py"
+
+
+def compile_env(env_file):
+    """Write the parsed key/value pairs of env_file to env_compiled.py"""
+    # Keys declared without a value (e.g. "FOO") parse as None; skip them
+    # like load_dotenv() does
+    values = {k: v for k, v in dotenv_values(env_file).items() if v is not None}
+
+    lines = [
+        '"""',
+        f"Generated by scripts/compile_env.py from {Path(env_file).name} - do not edit",
+        '"""',
+        "",
+        "ENV = {",
+    ]
+    for key, value in values.items():
+        lines.append(f"    {key!r}: {value!r},")
+    lines.append("}")
+
+    OUTPUT_FILE.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return len(values)
+
+
+if __name__ == "__main__":
+    env_file = Path(sys.argv[1]) if len(sys.argv) > 1 else ROOT_DIR / ".env"
+    if not env_file.is_file():
+        print(f"❌ {env_file} not found")
+        sys.exit(1)
+
+    count = compile_env(env_file)
+    print(f"✓ Compiled {count} variable(s) from {env_file} into {OUTPUT_FILE}")
@@ -3,18 +3,133 @@ Speech-to-Speech Voice Agent using GPT-4o Realtime API
 No separate STT/TTS needed - direct audio-to-audio processing
 """
 import asyncio
-import json
 import base64
-import wave
+import hashlib
+import logging
+import logging.handlers
+import os
+import re
+import signal
+import socket
+import stat
+import struct
+import sys
+import time
+import traceback
 from datetime import datetime
 from pathlib import Path
+from queue import SimpleQueue
 from urllib.parse import urlencode
-from aiohttp import web
+from aiohttp import web, WSCloseCode, WSMsgType
 from aiohttp.web_ws import WebSocketResponse
+import msgspec
+import orjson
 import websockets
 from websockets.exceptions import ConnectionClosed
 
+# uvloop has no Windows support; fall back to the default asyncio loop there
+uvloop = None
+if sys.platform != "win32":
+    try:
+        import uvloop
+    except ImportError:
+        pass
+
 import config
+from config import CONFIG
+
+# Hot-path logging goes through this logger so disabled levels cost a single
+# level check instead of formatting an f-string. TRACE is for per-chunk audio.
+logger = logging.getLogger("sts")
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+# Pre-encoded JSON envelope for the per-chunk upstream audio message. Base64 is
+# plain ASCII with no characters that need JSON escaping, so the payload can be
+# spliced in directly instead of running a JSON encoder over a multi-KB string.
+_AUDIO_APPEND_PREFIX = '{"type":"input_audio_buffer.append","audio":"'
+_AUDIO_SUFFIX = '"}'
+# Strict base64 (padded, no whitespace or control characters): anything else
+# would corrupt the spliced frame and every chunk batched with it
+_BASE64_RE = re.compile(r'[A-Za-z0-9+/]*={0,2}')
+
+# Static browser notifications, encoded once instead of per event
+MSG_SPEECH_STARTED = '{"type":"speech_started"}'
+MSG_SPEECH_STOPPED = '{"type":"speech_stopped"}'
+MSG_THINKING_START = '{"type":"thinking","status":"start"}'
+MSG_AUDIO_COMPLETE = '{"type":"audio_complete"}'
+MSG_RESPONSE_DONE = '{"type":"response_done"}'
+
+# Typed browser messages with dynamic payloads. msgspec compiles an encoder per
+# struct, so no intermediate dict is built; the tag supplies the "type" field.
+class TranscriptMsg(msgspec.Struct, tag_field="type", tag="transcript"):
+    text: str
+
+
+class ResponseTranscriptDeltaMsg(msgspec.Struct, tag_field="type", tag="response_transcript_delta"):
+    delta: str
+
+
+class ResponseTextMsg(msgspec.Struct, tag_field="type", tag="response_text"):
+    text: str
+
+
+class ErrorMsg(msgspec.Struct, tag_field="type", tag="error"):
+    message: str
+
+
+# The subset of OpenAI Realtime event fields this agent reads. Decoding into a
+# struct skips every other field instead of materialising it in a dict.
+class OpenAIEvent(msgspec.Struct):
+    type: str = ''
+    delta: str | None = None
+    transcript: str | None = None
+    response: dict | None = None
+    item: dict | None = None
+    error: dict | None = None
+
+
+_encode_msg = msgspec.json.Encoder().encode
+_decode_event = msgspec.json.Decoder(OpenAIEvent).decode
+
+
+def _encode(msg):
+    """Encode a browser message struct as JSON text"""
+    return _encode_msg(msg).decode()
+
+
+# Upper bound on browser messages held back while draining a burst of OpenAI events
+_MAX_BURST = 32
+# Linux-only socket option used to coalesce a burst of writes into full segments
+_TCP_CORK = getattr(socket, 'TCP_CORK', None)
+
+
+def _dumps(obj):
+    """Encode obj as JSON text with orjson (both peers expect text frames)"""
+    return orjson.dumps(obj).decode()
+
+
+def _wav_header(num_bytes, sample_rate):
+    """Build the 44-byte RIFF/WAVE header for mono 16-bit PCM"""
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + num_bytes, b'WAVE',
+        b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b'data', num_bytes
+    )
+
+
+def _write_wav(path, header, audio_data):
+    """Write a WAV header and PCM body with raw os.write calls (runs off the event loop)"""
+    # O_BINARY (Windows only) stops newline translation from corrupting the PCM
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        for chunk in (memoryview(header), memoryview(audio_data)):
+            while chunk:
+                chunk = chunk[os.write(fd, chunk):]
+    finally:
+        os.close(fd)
 
 
 class STSVoiceAgent:
@@ -24,63 +139,142 @@ class STSVoiceAgent:
         self.active_connections = set()
         self.openai_ws = None
         self.session_configured = False
+        # Last session.update sent on openai_ws, so a reused connection can skip it
+        self._session_config_sent = None
+        # Whether a browser session has used openai_ws (it then needs a reset
+        # before reuse), and the conversation item ids that session created
+        self._openai_used = False
+        self._conversation_items = []
         
-        # Audio recording storage (only if enabled)
-        self.audio_recordings = {}
-        if config.ENABLE_RECORDINGS:
+        # Audio recording directory (only if enabled); each connection keeps
+        # its own buffer in handle_browser_websocket
+        if CONFIG.enable_recordings:
             self.recordings_dir = Path(__file__).parent / "recordings"
             self.recordings_dir.mkdir(exist_ok=True)
         else:
             self.recordings_dir = None
         
-        # Response tracking
+        # Response tracking (turn_idle is set whenever no response is in flight)
         self.current_response_id = None
         self.is_responding = False
+        self._turn_idle = asyncio.Event()
+        self._turn_idle.set()
+        
+        # Browser -> OpenAI audio: a queue drained by a forwarder task that
+        # coalesces chunks into batched input_audio_buffer.append sends
+        self._to_openai = None
+        self._forwarder = None
+        self._flush_now = asyncio.Event()
+        # Task reading OpenAI events for the current browser session
+        self._receiver = None
+        
+        # Browser WebSocket send path, bound per connection by _bind_browser_ws
+        self._browser_send = None
+        self._browser_send_bytes = None
+        self._browser_sock = None
+        self._browser_is_closed = lambda: True
+        
+        # Browser JSON message handlers, keyed by message type
+        self._handlers = {
+            'session_start': self._h_session_start,
+            'input_audio_buffer.append': self._h_audio_append,
+            'interrupt': self._h_interrupt,
+            'text_message': self._h_text,
+            'update_sensitivity': self._h_vad,
+        }
+        
+        # Set to stop the server (init_unified_server waits on it)
+        self.stop_event = asyncio.Event()
+        self._shutdown_task = None
         
         # Error throttling (prevent spam)
         self.last_error_time = 0
         self.error_count = 0
     
-    async def _send_ws_message(self, websocket, message):
-        """Send message through WebSocket (works with both websockets and aiohttp)"""
+    def _bind_browser_ws(self, websocket):
+        """Resolve the browser connection's send/closed accessors once per connection
+        (works with both websockets and aiohttp)"""
+        if hasattr(websocket, 'send_str'):
+            # aiohttp WebSocketResponse
+            self._browser_send = websocket.send_str
+            self._browser_send_bytes = websocket.send_bytes
+            get_extra_info = getattr(websocket, 'get_extra_info', None)
+            self._browser_sock = get_extra_info('socket') if get_extra_info else None
+        else:
+            # websockets library
+            self._browser_send = websocket.send
+            self._browser_send_bytes = websocket.send
+            transport = getattr(websocket, 'transport', None)
+            self._browser_sock = transport.get_extra_info('socket') if transport else None
+        self._browser_is_closed = lambda: websocket.closed
+    
+    async def _send_many(self, messages):
+        """Send a burst of messages to the browser, corking the socket (Linux
+        TCP_CORK) so they share TCP segments instead of one write each"""
+        if len(messages) == 1:
+            await self._send_ws_message(messages[0])
+            return
+        
+        sock = self._browser_sock
+        corked = False
+        if sock is not None and _TCP_CORK is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 1)
+                corked = True
+            except OSError:
+                pass
+        try:
+            for message in messages:
+                await self._send_ws_message(message)
+        finally:
+            if corked:
+                try:
+                    sock.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 0)
+                except OSError:
+                    pass
+    
+    async def _send_ws_message(self, message):
+        """Send message to the browser through the bound WebSocket
+        (str as a JSON text frame, bytes as a binary PCM16 audio frame)"""
+        if self._browser_is_closed():
+            logger.debug("⚠️ WebSocket is closed, skipping message")
+            return
         try:
-            if hasattr(websocket, 'send_str'):
-                # aiohttp WebSocketResponse
-                if websocket.closed or (hasattr(websocket, 'closing') and websocket.closing):
-                    if config.DEBUG:
-                        print(f"⚠️ WebSocket is closed/closing, skipping message")
-                    return
-                return await websocket.send_str(message)
+            if isinstance(message, bytes):
+                await self._browser_send_bytes(message)
             else:
-                # websockets library
-                if websocket.closed:
-                    if config.DEBUG:
-                        print(f"⚠️ WebSocket is closed, skipping message")
-                    return
-                return await websocket.send(message)
-        except (ConnectionError, OSError, RuntimeError, Exception) as e:
+                await self._browser_send(message)
+        except Exception as e:
             # WebSocket is closing or closed - ignore
             error_type = type(e).__name__
-            if config.DEBUG:
-                print(f"⚠️ Could not send message (WebSocket error: {error_type}): {str(e) if str(e) else repr(e)}")
-            return
+            logger.debug("⚠️ Could not send message (WebSocket error: %s): %s", error_type, str(e) or repr(e))
         
     async def initialize(self):
         """Initialize the STS agent"""
         print("Initializing STS Voice Agent...")
         config.validate_config()
         
-        if config.ENABLE_RECORDINGS:
+        if CONFIG.enable_recordings:
             print(f"✓ Recordings enabled (saving to: {self.recordings_dir})")
         else:
             print("ℹ️ Recordings disabled (set ENABLE_RECORDINGS=true to enable)")
         
+        # Open the Realtime connection up front so the first browser session
+        # doesn't pay for the TLS handshake and session setup. It is reused by
+        # every browser session; on failure the first session connects instead.
+        if await self.connect_to_openai():
+            await self.configure_session()
+        
         print("=" * 60)
         print("STS Voice Agent Ready!")
         print("=" * 60)
     
     async def connect_to_openai(self):
         """Establish WebSocket connection to OpenAI or Azure OpenAI Realtime API"""
+        # A fresh connection starts with a default session and no conversation
+        self._session_config_sent = None
+        self._openai_used = False
+        self._conversation_items = []
         
         if config.USE_AZURE:
             # Azure OpenAI Realtime API
@@ -126,7 +320,12 @@ class STSVoiceAgent:
                     url,
                     additional_headers=headers,
                     ping_interval=20,
-                    ping_timeout=20
+                    # Connection is long-lived now; notice a dead peer sooner
+                    ping_timeout=10,
+                    # Don't cap incoming frame size (large session/response events)
+                    max_size=None,
+                    # Base64 audio doesn't compress; skip permessage-deflate
+                    compression=None
                 ),
                 timeout=30.0
             )
@@ -148,7 +347,12 @@ class STSVoiceAgent:
                             url,
                             extra_headers=headers,
                             ping_interval=20,
-                            ping_timeout=20
+                            # Connection is long-lived now; notice a dead peer sooner
+                            ping_timeout=10,
+                            # Don't cap incoming frame size (large session/response events)
+                            max_size=None,
+                            # Base64 audio doesn't compress; skip permessage-deflate
+                            compression=None
                         ),
                         timeout=30.0
                     )
@@ -170,7 +374,6 @@ class STSVoiceAgent:
                     print(f"  Error Message: {error_str if error_str else '(empty)'}")
                     print(f"  Error Repr: {error_repr}")
                     print(f"  URL: {url}")
-                    import traceback
                     print(f"  Full Traceback:")
                     for line in traceback.format_exc().split('\n'):
                         if line.strip():
@@ -188,7 +391,6 @@ class STSVoiceAgent:
             print(f"  Error Message: {error_str if error_str else '(empty)'}")
             print(f"  Error Repr: {error_repr}")
             print(f"  URL: {url}")
-            import traceback
             print(f"  Full Traceback:")
             for line in traceback.format_exc().split('\n'):
                 if line.strip():
@@ -206,8 +408,8 @@ class STSVoiceAgent:
                 "modalities": ["text", "audio"],
                 "instructions": config.SYSTEM_PROMPT,
                 "voice": config.VOICE,
-                "input_audio_format": config.AUDIO_FORMAT,
-                "output_audio_format": config.AUDIO_FORMAT,
+                "input_audio_format": CONFIG.audio_format,
+                "output_audio_format": CONFIG.audio_format,
                 "input_audio_transcription": {
                     "model": "whisper-1",
                     "language": "en"  # Force English transcription
@@ -221,11 +423,72 @@ class STSVoiceAgent:
             }
         }
         
-        await self.openai_ws.send(json.dumps(session_config))
+        message = _dumps(session_config)
+        if message == self._session_config_sent:
+            # Reused connection already has this exact configuration
+            self.session_configured = True
+            print("✓ Session configuration unchanged, skipping session.update")
+            return True
+        
+        await self.openai_ws.send(message)
+        self._session_config_sent = message
         self.session_configured = True
         print("✓ Session configured")
         return True
     
+    async def _reset_openai_session(self, timeout=5.0):
+        """Discard the previous browser session's state on a reused OpenAI
+        connection: cancel any in-flight response, delete its conversation
+        items, clear the input buffer, and drop the events already queued for
+        it. Returns False if the connection is dead or the reset doesn't finish
+        within timeout, in which case the caller reconnects."""
+        ws = self.openai_ws
+        try:
+            responding = self.is_responding
+            if responding:
+                await ws.send(_dumps({"type": "response.cancel"}))
+            for item_id in self._conversation_items:
+                await ws.send(_dumps({"type": "conversation.item.delete", "item_id": item_id}))
+            self._conversation_items.clear()
+            await ws.send(_dumps({"type": "input_audio_buffer.clear"}))
+            
+            # Events arrive in order, so everything left over from the old
+            # session is received before input_audio_buffer.cleared, except
+            # the tail of a cancelled response, which ends with response.done
+            cleared = False
+            deadline = time.monotonic() + timeout
+            while not cleared or responding:
+                message = await asyncio.wait_for(ws.recv(), deadline - time.monotonic())
+                try:
+                    event = _decode_event(message)
+                except msgspec.DecodeError:
+                    continue
+                event_type = event.type
+                if event_type == 'input_audio_buffer.cleared':
+                    cleared = True
+                elif event_type == 'response.created':
+                    # Started by the old session's audio after it disconnected
+                    responding = True
+                    await ws.send(_dumps({"type": "response.cancel"}))
+                elif event_type in ('response.done', 'response.cancelled'):
+                    responding = False
+                elif event_type == 'conversation.item.created':
+                    item_id = (event.item or {}).get('id')
+                    if item_id:
+                        await ws.send(_dumps({"type": "conversation.item.delete", "item_id": item_id}))
+        except asyncio.TimeoutError:
+            print("⚠️ Existing OpenAI connection did not reset in time, reconnecting")
+            return False
+        except Exception as e:
+            print(f"⚠️ Existing OpenAI connection unusable ({type(e).__name__}), reconnecting")
+            return False
+        
+        self.is_responding = False
+        self.current_response_id = None
+        self._turn_idle.set()
+        print("✓ Reusing existing OpenAI Realtime connection")
+        return True
+    
     async def update_vad_threshold(self, threshold: float):
         """Update the VAD threshold in real-time"""
         if not self.openai_ws:
@@ -246,7 +509,9 @@ class STSVoiceAgent:
             }
         }
         
-        await self.openai_ws.send(json.dumps(update_config))
+        await self.openai_ws.send(_dumps(update_config))
+        # The live session no longer matches the base configuration
+        self._session_config_sent = None
         print(f"🎚️ VAD threshold updated to: {threshold}")
     
     async def handle_browser_websocket(self, websocket, path=None):
@@ -264,17 +529,10 @@ class STSVoiceAgent:
         
         print(f"Browser connected from {remote_addr}")
         
-        # Close any existing connections
+        # Close any existing browser connections (the OpenAI connection is
+        # kept and reused below)
         if self.active_connections:
             print(f"  Closing {len(self.active_connections)} old connection(s)")
-            # Close old OpenAI connection
-            if self.openai_ws:
-                try:
-                    await self.openai_ws.close()
-                except:
-                    pass
-                self.openai_ws = None
-            
             for old_ws in list(self.active_connections):
                 try:
                     await old_ws.close()
@@ -283,110 +541,89 @@ class STSVoiceAgent:
             self.active_connections.clear()
         
         self.active_connections.add(websocket)
+        self._bind_browser_ws(websocket)
+        
+        # Recording buffer for this connection only (saved when it closes)
+        recording_buf = bytearray() if CONFIG.enable_recordings else None
+        
+        # Stop the previous session's tasks before touching the OpenAI
+        # connection: only one reader is allowed, and late audio from the old
+        # forwarder would land in the new session's input buffer
+        stale = [task for task in (self._receiver, self._forwarder) if task is not None]
+        if stale:
+            for task in stale:
+                task.cancel()
+            await asyncio.wait(stale)
+        
+        # Reuse the OpenAI connection from the previous session if it is still
+        # healthy, saving the TLS handshake and session setup round-trips
+        if self.openai_ws is not None and self.openai_ws.closed:
+            self.openai_ws = None
+        if self.openai_ws is not None and self._openai_used and not await self._reset_openai_session():
+            try:
+                await self.openai_ws.close()
+            except Exception:
+                pass
+            self.openai_ws = None
         
         # Connect to OpenAI for this session
-        if not await self.connect_to_openai():
-            await self._send_ws_message(websocket, json.dumps({
-                'type': 'error',
-                'message': 'Failed to connect to OpenAI Realtime API'
-            }))
+        if self.openai_ws is None and not await self.connect_to_openai():
+            await self._send_ws_message(
+                _encode(ErrorMsg(message='Failed to connect to OpenAI Realtime API'))
+            )
             return
         
         await self.configure_session()
         
         # Start background task to receive from OpenAI
         openai_task = asyncio.create_task(
-            self.receive_from_openai(websocket)
+            self.receive_from_openai()
         )
+        self._receiver = openai_task
+        self._openai_used = True
+        
+        # Start background task to forward browser audio to OpenAI
+        audio_queue = asyncio.Queue(maxsize=CONFIG.queue_maxsize)
+        self._to_openai = audio_queue
+        self._flush_now.clear()
+        forwarder_task = asyncio.create_task(self._forward_loop())
+        self._forwarder = forwarder_task
         
         try:
             async for message in websocket:
                 try:
-                    # Handle both aiohttp WebSocketMessage and websockets string
+                    # Binary frames are raw PCM16 audio; text frames are JSON
+                    # control messages (aiohttp WSMessage or websockets str/bytes)
                     if hasattr(message, 'data'):
                         # aiohttp WebSocketMessage
-                        message_str = message.data if isinstance(message.data, str) else message.data.decode('utf-8')
+                        if message.type == WSMsgType.BINARY:
+                            audio_bytes = message.data
+                            self.forward_audio(
+                                recording_buf, base64.b64encode(audio_bytes).decode('ascii'), audio_bytes
+                            )
+                            continue
+                        message_str = message.data
+                    elif isinstance(message, bytes):
+                        # websockets library (binary)
+                        self.forward_audio(
+                            recording_buf, base64.b64encode(message).decode('ascii'), message
+                        )
+                        continue
                     else:
                         # websockets library (string)
                         message_str = message
                     
-                    data = json.loads(message_str)
+                    data = orjson.loads(message_str)
                     msg_type = data.get('type')
                     
-                    if msg_type == 'session_start':
-                        print("📱 Session started")
-                        # Send greeting
-                        await self.send_greeting()
-                    
-                    elif msg_type == 'input_audio_buffer.append':
-                        # Forward audio to OpenAI
-                        audio_base64 = data.get('audio', '')
-                        
-                        if config.VERBOSE:
-                            audio_bytes = base64.b64decode(audio_base64)
-                            print(f"📊 Forwarding audio: {len(audio_bytes)} bytes")
-                        
-                        # Store for recording (if enabled)
-                        if config.ENABLE_RECORDINGS:
-                            if websocket not in self.audio_recordings:
-                                self.audio_recordings[websocket] = []
-                            self.audio_recordings[websocket].append(
-                                base64.b64decode(audio_base64)
-                            )
-                        
-                        # Forward to OpenAI
-                        if self.openai_ws:
-                            try:
-                                await self.openai_ws.send(json.dumps({
-                                    "type": "input_audio_buffer.append",
-                                    "audio": audio_base64
-                                }))
-                            except Exception as e:
-                                # Connection might have closed
-                                import time
-                                current_time = time.time()
-                                if current_time - self.last_error_time > 1.0:  # Throttle to once per second
-                                    print(f"⚠️ Error sending audio to OpenAI: {type(e).__name__}")
-                                    self.last_error_time = current_time
-                                    self.error_count = 0
-                                self.error_count += 1
-                                # If connection is closed, set to None
-                                if "closed" in str(e).lower() or "connection" in str(e).lower():
-                                    self.openai_ws = None
-                        else:
-                            # Throttle error messages
-                            import time
-                            current_time = time.time()
-                            if current_time - self.last_error_time > 1.0:
-                                print("⚠️ Cannot send audio: OpenAI connection not established")
-                                self.last_error_time = current_time
-                                self.error_count = 0
-                            self.error_count += 1
-                    
-                    elif msg_type == 'interrupt':
-                        # User interrupted - cancel current response
-                        if self.is_responding and self.current_response_id and self.openai_ws:
-                            await self.openai_ws.send(json.dumps({
-                                "type": "response.cancel"
-                            }))
-                            print("⏹️ Response cancelled by user")
-                    
-                    elif msg_type == 'text_message':
-                        # Direct text input
-                        text = data.get('text', '').strip()
-                        if text:
-                            await self.send_text_message(text)
-                    
-                    elif msg_type == 'update_sensitivity':
-                        # Update VAD threshold
-                        threshold = data.get('threshold', 0.7)
-                        await self.update_vad_threshold(threshold)
+                    handler = self._handlers.get(msg_type)
+                    if handler:
+                        await handler(data, recording_buf)
                 
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     print("⚠️ Invalid JSON received from browser")
                 except Exception as e:
                     # Throttle error messages to prevent spam
-                    import time
                     current_time = time.time()
                     if current_time - self.last_error_time > 1.0:
                         error_type = type(e).__name__
@@ -402,33 +639,186 @@ class STSVoiceAgent:
             print(f"❌ Browser WebSocket error: {e}")
         finally:
             openai_task.cancel()
+            forwarder_task.cancel()
+            if self._receiver is openai_task:
+                self._receiver = None
+            if self._to_openai is audio_queue:
+                self._to_openai = None
+                self._forwarder = None
             
             # Save recording (if enabled)
-            if config.ENABLE_RECORDINGS and websocket in self.audio_recordings:
-                await self.save_recording(websocket)
-            
-            # Close OpenAI connection
-            if self.openai_ws:
-                await self.openai_ws.close()
-                self.openai_ws = None
+            if recording_buf:
+                await self.save_recording(recording_buf)
             
+            # The OpenAI connection stays open for the next browser session;
+            # cleanup() closes it on shutdown
             self.active_connections.discard(websocket)
             self.session_configured = False
     
-    async def receive_from_openai(self, browser_ws):
+    async def _h_session_start(self, data, recording_buf):
+        """Browser session started - play the greeting"""
+        print("📱 Session started")
+        await self.send_greeting()
+    
+    async def _h_audio_append(self, data, recording_buf):
+        """Legacy JSON audio frame (current clients send binary frames)"""
+        audio_base64 = data.get('audio', '')
+        
+        # Browser audio is spliced into the template unescaped and joined with
+        # neighbouring chunks, so accept only well-formed base64
+        if (not isinstance(audio_base64, str) or len(audio_base64) % 4
+                or not _BASE64_RE.fullmatch(audio_base64)):
+            print("⚠️ Invalid audio payload received from browser")
+            return
+        
+        self.forward_audio(recording_buf, audio_base64)
+    
+    async def _h_interrupt(self, data, recording_buf):
+        """User interrupted - cancel current response"""
+        await self.flush_audio()
+        if self.is_responding and self.current_response_id and self.openai_ws:
+            await self.openai_ws.send(_dumps({
+                "type": "response.cancel"
+            }))
+            print("⏹️ Response cancelled by user")
+    
+    async def _h_text(self, data, recording_buf):
+        """Direct text input"""
+        text = data.get('text', '').strip()
+        if text:
+            await self.send_text_message(text)
+    
+    async def _h_vad(self, data, recording_buf):
+        """Update VAD threshold"""
+        threshold = data.get('threshold', 0.7)
+        await self.update_vad_threshold(threshold)
+    
+    def forward_audio(self, recording_buf, audio_base64, audio_bytes=None):
+        """Forward one audio chunk to OpenAI and record it (if enabled)
+        
+        audio_bytes is the raw PCM16 when the browser sent a binary frame;
+        for JSON frames it is decoded from audio_base64 only when needed.
+        recording_buf is the connection's recording bytearray, or None.
+        """
+        # Decode at most once, and only if something needs the raw bytes
+        trace = logger.isEnabledFor(TRACE)
+        if audio_bytes is None and (trace or recording_buf is not None):
+            audio_bytes = base64.b64decode(audio_base64)
+        
+        if trace:
+            logger.log(TRACE, "📊 Forwarding audio: %d bytes", len(audio_bytes))
+        
+        # Store for recording (if enabled)
+        if recording_buf is not None:
+            recording_buf.extend(audio_bytes)
+        
+        # Hand off to the forwarder task so a slow upstream never stalls reads
+        queue = self._to_openai
+        if queue is None:
+            return
+        if queue.full():
+            # Upstream is falling behind: drop the oldest chunk instead of blocking
+            queue.get_nowait()
+            queue.task_done()
+        queue.put_nowait(audio_base64)
+    
+    async def _forward_loop(self):
+        """Send queued browser audio to OpenAI, coalescing chunks within the batch window"""
+        queue = self._to_openai
+        try:
+            while True:
+                batch = [await queue.get()]
+                
+                # Let the batch window fill unless a flush was requested
+                if not self._flush_now.is_set():
+                    try:
+                        await asyncio.wait_for(self._flush_now.wait(), CONFIG.audio_batch_ms / 1000)
+                    except asyncio.TimeoutError:
+                        pass
+                self._flush_now.clear()
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                
+                try:
+                    # Base64 padding is only valid at the end of the joined payload,
+                    # so split the batch after every padded chunk
+                    start = 0
+                    for i, chunk in enumerate(batch):
+                        if chunk.endswith('=') or i == len(batch) - 1:
+                            await self._send_audio(batch[start:i + 1])
+                            start = i + 1
+                finally:
+                    for _ in batch:
+                        queue.task_done()
+        
+        except asyncio.CancelledError:
+            # Chunks left in the queue will never be sent; mark them done so
+            # a pending flush_audio() (queue.join) doesn't wait forever
+            while not queue.empty():
+                queue.get_nowait()
+                queue.task_done()
+            raise
+    
+    async def flush_audio(self):
+        """Wait until all queued browser audio has been sent to OpenAI
+        
+        Called before control messages so they never overtake earlier audio.
+        """
+        queue = self._to_openai
+        if queue is None or self._forwarder is None or self._forwarder.done():
+            return
+        if not queue.empty():
+            self._flush_now.set()
+        await queue.join()
+    
+    async def _send_audio(self, chunks):
+        """Send base64 chunks to OpenAI as one input_audio_buffer.append"""
+        # Forward to OpenAI
+        if self.openai_ws:
+            try:
+                # A single join allocates the final frame once, with no
+                # intermediate joined-payload string
+                await self.openai_ws.send(
+                    ''.join((_AUDIO_APPEND_PREFIX, *chunks, _AUDIO_SUFFIX))
+                )
+            except Exception as e:
+                # Connection might have closed
+                current_time = time.time()
+                if current_time - self.last_error_time > 1.0:  # Throttle to once per second
+                    print(f"⚠️ Error sending audio to OpenAI: {type(e).__name__}")
+                    self.last_error_time = current_time
+                    self.error_count = 0
+                self.error_count += 1
+                # If connection is closed, set to None
+                if "closed" in str(e).lower() or "connection" in str(e).lower():
+                    self.openai_ws = None
+        else:
+            # Throttle error messages
+            current_time = time.time()
+            if current_time - self.last_error_time > 1.0:
+                print("⚠️ Cannot send audio: OpenAI connection not established")
+                self.last_error_time = current_time
+                self.error_count = 0
+            self.error_count += 1
+    
+    async def receive_from_openai(self):
         """Receive events from OpenAI and forward to browser"""
         if not self.openai_ws:
             print("⚠️ Cannot receive from OpenAI: connection not established")
             return
         
+        # Browser messages produced while a burst of OpenAI events is already
+        # buffered are collected here and sent together via _send_many
+        outbound = []
+        
         try:
             async for message in self.openai_ws:
                 try:
-                    event = json.loads(message)
-                    event_type = event.get('type', '')
+                    event = _decode_event(message)
+                    event_type = event.type
                     
-                    if config.DEBUG and event_type not in ['response.audio.delta']:
-                        print(f"📨 OpenAI event: {event_type}")
+                    if event_type != 'response.audio.delta':
+                        logger.debug("📨 OpenAI event: %s", event_type)
                     
                     # Handle different event types
                     if event_type == 'session.created':
@@ -439,42 +829,36 @@ class STSVoiceAgent:
                     
                     elif event_type == 'input_audio_buffer.speech_started':
                         # User started speaking - notify browser
-                        await self._send_ws_message(browser_ws, json.dumps({
-                            'type': 'speech_started'
-                        }))
-                        if config.DEBUG:
-                            print("🎤 Speech detected")
+                        outbound.append(MSG_SPEECH_STARTED)
+                        logger.debug("🎤 Speech detected")
                     
                     elif event_type == 'input_audio_buffer.speech_stopped':
-                        # User stopped speaking
-                        await self._send_ws_message(browser_ws, json.dumps({
-                            'type': 'speech_stopped'
-                        }))
-                        if config.DEBUG:
-                            print("🔇 Speech ended")
+                        # User stopped speaking - push out any batched audio
+                        await self.flush_audio()
+                        outbound.append(MSG_SPEECH_STOPPED)
+                        logger.debug("🔇 Speech ended")
                     
                     elif event_type == 'input_audio_buffer.committed':
-                        if config.DEBUG:
-                            print("✓ Audio buffer committed")
+                        logger.debug("✓ Audio buffer committed")
+                    
+                    elif event_type == 'conversation.item.created':
+                        # Remembered so a reused connection can delete them
+                        item_id = (event.item or {}).get('id')
+                        if item_id:
+                            self._conversation_items.append(item_id)
                     
                     elif event_type == 'conversation.item.input_audio_transcription.completed':
                         # Transcription of user's speech
-                        transcript = event.get('transcript', '')
+                        transcript = event.transcript
                         if transcript:
-                            await self._send_ws_message(browser_ws, json.dumps({
-                                'type': 'transcript',
-                                'text': transcript
-                            }))
-                            if config.DEBUG:
-                                print(f"📝 User said: {transcript}")
+                            outbound.append(_encode(TranscriptMsg(text=transcript)))
+                            logger.debug("📝 User said: %s", transcript)
                     
                     elif event_type == 'response.created':
-                        self.current_response_id = event.get('response', {}).get('id')
+                        self.current_response_id = (event.response or {}).get('id')
                         self.is_responding = True
-                        await self._send_ws_message(browser_ws, json.dumps({
-                            'type': 'thinking',
-                            'status': 'start'
-                        }))
+                        self._turn_idle.clear()
+                        outbound.append(MSG_THINKING_START)
                     
                     elif event_type == 'response.output_item.added':
                         # New output item being created
@@ -486,73 +870,62 @@ class STSVoiceAgent:
                     
                     elif event_type == 'response.audio_transcript.delta':
                         # Streaming transcript of AI response
-                        delta = event.get('delta', '')
+                        delta = event.delta
                         if delta:
-                            await self._send_ws_message(browser_ws, json.dumps({
-                                'type': 'response_transcript_delta',
-                                'delta': delta
-                            }))
+                            outbound.append(_encode(ResponseTranscriptDeltaMsg(delta=delta)))
                     
                     elif event_type == 'response.audio_transcript.done':
                         # Full transcript of AI response
-                        transcript = event.get('transcript', '')
+                        transcript = event.transcript
                         if transcript:
-                            await self._send_ws_message(browser_ws, json.dumps({
-                                'type': 'response_text',
-                                'text': transcript
-                            }))
-                            if config.DEBUG:
-                                print(f"💬 AI: {transcript}")
+                            outbound.append(_encode(ResponseTextMsg(text=transcript)))
+                            logger.debug("💬 AI: %s", transcript)
                     
                     elif event_type == 'response.audio.delta':
-                        # Audio data from OpenAI
-                        audio_base64 = event.get('delta', '')
+                        # Audio data from OpenAI, sent to the browser as a raw
+                        # PCM16 binary frame (no JSON wrapper or browser-side base64)
+                        audio_base64 = event.delta
                         if audio_base64:
-                            await self._send_ws_message(browser_ws, json.dumps({
-                                'type': 'audio_chunk',
-                                'audio': audio_base64
-                            }))
+                            outbound.append(base64.b64decode(audio_base64))
                     
                     elif event_type == 'response.audio.done':
                         # Audio complete
-                        await self._send_ws_message(browser_ws, json.dumps({
-                            'type': 'audio_complete'
-                        }))
+                        outbound.append(MSG_AUDIO_COMPLETE)
                     
                     elif event_type == 'response.done':
                         # Response complete
                         self.is_responding = False
                         self.current_response_id = None
-                        await self._send_ws_message(browser_ws, json.dumps({
-                            'type': 'response_done'
-                        }))
-                        if config.DEBUG:
-                            print("✓ Response complete")
+                        self._turn_idle.set()
+                        outbound.append(MSG_RESPONSE_DONE)
+                        logger.debug("✓ Response complete")
                     
                     elif event_type == 'error':
-                        error = event.get('error', {})
+                        error = event.error or {}
                         error_msg = error.get('message', 'Unknown error')
                         
                         # Filter out harmless errors
                         if 'no active response' in error_msg.lower():
                             # This is benign - happens when user speaks but AI wasn't responding
-                            if config.DEBUG:
-                                print(f"ℹ️ Benign error (ignored): {error_msg}")
+                            logger.debug("ℹ️ Benign error (ignored): %s", error_msg)
                         else:
                             print(f"❌ OpenAI error: {error}")
-                            await self._send_ws_message(browser_ws, json.dumps({
-                                'type': 'error',
-                                'message': error_msg
-                            }))
+                            outbound.append(_encode(ErrorMsg(message=error_msg)))
                     
                     elif event_type == 'rate_limits.updated':
                         # Rate limit info
                         pass
                 
-                except json.JSONDecodeError:
+                except msgspec.DecodeError:
                     print("⚠️ Invalid JSON from OpenAI")
                 except Exception as e:
                     print(f"⚠️ Error processing OpenAI event: {e}")
+                
+                # Flush once no further events are waiting (or the burst gets long)
+                if outbound and (not getattr(self.openai_ws, 'messages', None)
+                                 or len(outbound) >= _MAX_BURST):
+                    await self._send_many(outbound)
+                    outbound.clear()
         
         except ConnectionClosed:
             print("⚠️ OpenAI connection closed")
@@ -568,8 +941,11 @@ class STSVoiceAgent:
         
         greeting = "Hello! I'm your STS voice assistant. Just start speaking and I'll respond."
         
+        # Send queued audio first so the new item doesn't overtake it
+        await self.flush_audio()
+        
         # Create a conversation item with the greeting
-        await self.openai_ws.send(json.dumps({
+        await self.openai_ws.send(_dumps({
             "type": "conversation.item.create",
             "item": {
                 "type": "message",
@@ -582,7 +958,7 @@ class STSVoiceAgent:
         }))
         
         # Request response to speak the greeting
-        await self.openai_ws.send(json.dumps({
+        await self.openai_ws.send(_dumps({
             "type": "response.create",
             "response": {
                 "modalities": ["text", "audio"]
@@ -594,8 +970,11 @@ class STSVoiceAgent:
         if not self.openai_ws:
             return
         
+        # Send queued audio first so the new item doesn't overtake it
+        await self.flush_audio()
+        
         # Create conversation item
-        await self.openai_ws.send(json.dumps({
+        await self.openai_ws.send(_dumps({
             "type": "conversation.item.create",
             "item": {
                 "type": "message",
@@ -608,92 +987,168 @@ class STSVoiceAgent:
         }))
         
         # Request response
-        await self.openai_ws.send(json.dumps({
+        await self.openai_ws.send(_dumps({
             "type": "response.create"
         }))
     
-    async def save_recording(self, websocket):
+    async def save_recording(self, audio_data):
         """Save the recorded audio to a WAV file"""
-        if websocket not in self.audio_recordings:
-            return
-        
-        audio_chunks = self.audio_recordings[websocket]
-        if not audio_chunks:
-            del self.audio_recordings[websocket]
+        if not audio_data:
             return
         
         try:
-            audio_data = b''.join(audio_chunks)
-            
-            if len(audio_data) == 0:
-                del self.audio_recordings[websocket]
-                return
-            
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"recording_{timestamp}.wav"
             filepath = self.recordings_dir / filename
             
-            with wave.open(str(filepath), 'wb') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(config.SAMPLE_RATE)
-                wav_file.writeframes(audio_data)
+            header = _wav_header(len(audio_data), CONFIG.sample_rate)
+            await asyncio.to_thread(_write_wav, filepath, header, audio_data)
             
-            duration = len(audio_data) / (config.SAMPLE_RATE * 2)
+            duration = len(audio_data) / (CONFIG.sample_rate * 2)
             print(f"💾 Recording saved: {filepath} ({duration:.2f}s)")
             
-            del self.audio_recordings[websocket]
-            
         except Exception as e:
             print(f"⚠️ Error saving recording: {e}")
-            if websocket in self.audio_recordings:
-                del self.audio_recordings[websocket]
+    
+    def request_shutdown(self, main_task=None):
+        """Signal handler entry point: start a graceful shutdown on the first
+        signal; on a repeated one, cancel main_task to force the exit"""
+        if self._shutdown_task is None:
+            self._shutdown_task = asyncio.create_task(self.shutdown())
+        elif main_task is not None and not main_task.done():
+            print("\n⚠️ Forcing shutdown")
+            main_task.cancel()
+    
+    async def shutdown(self, timeout=2.0):
+        """Let an in-flight voice turn finish (up to timeout), then stop the server"""
+        print("\n\n🛑 Shutting down...")
+        if self.is_responding:
+            try:
+                await asyncio.wait_for(self._turn_idle.wait(), timeout)
+            except asyncio.TimeoutError:
+                print("⚠️ Response still in progress, stopping anyway")
+        self.stop_event.set()
+    
+    async def close_browser_connections(self, timeout=2.0):
+        """Close every open browser WebSocket so its handler leaves the receive loop"""
+        if not self.active_connections:
+            return
+        closes = [
+            ws.close(code=WSCloseCode.GOING_AWAY, message=b'Server shutdown')
+            for ws in list(self.active_connections)
+        ]
+        try:
+            await asyncio.wait_for(asyncio.gather(*closes, return_exceptions=True), timeout)
+        except asyncio.TimeoutError:
+            print("⚠️ Browser connections did not close cleanly")
     
     async def cleanup(self):
         """Clean up resources"""
-        if config.ENABLE_RECORDINGS:
-            for websocket in list(self.audio_recordings.keys()):
-                await self.save_recording(websocket)
-        
         if self.openai_ws:
             await self.openai_ws.close()
 
 
+STATIC_DIR = (Path(__file__).parent / "web_ui").resolve()
+
+# Static assets only change on deploy, so keep them in memory after the first
+# read: resolved file path -> (body, content_type, etag). Keying on the resolved
+# path (not request.path) bounds the cache to the files under web_ui/.
+_STATIC_CACHE = {}
+
+
 async def serve_static(request):
     """Serve static files"""
-    static_dir = Path(__file__).parent / "web_ui"
-    
     if request.path == '/' or request.path == '':
-        file_path = static_dir / "sts_agent.html"
+        file_path = STATIC_DIR / "sts_agent.html"
     else:
-        file_path = static_dir / request.path.lstrip('/')
+        file_path = (STATIC_DIR / request.path.lstrip('/')).resolve()
+    
+    # Refuse anything that escapes web_ui/ (e.g. /../config.py)
+    if not file_path.is_relative_to(STATIC_DIR):
+        return web.Response(text="File not found", status=404)
     
-    if file_path.exists() and file_path.is_file():
+    cached = _STATIC_CACHE.get(file_path)
+    if cached is None:
+        # One stat call covers both "exists" and "is a regular file"
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return web.Response(text="File not found", status=404)
+        if not stat.S_ISREG(st.st_mode):
+            return web.Response(text="File not found", status=404)
+        
         content_type = 'text/html'
         if file_path.suffix == '.js':
             content_type = 'application/javascript'
         elif file_path.suffix == '.css':
             content_type = 'text/css'
         
-        return web.Response(
-            body=file_path.read_bytes(),
-            content_type=content_type
-        )
+        with open(file_path, 'rb') as f:
+            body = f.read(st.st_size)
+        etag = f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+        cached = _STATIC_CACHE[file_path] = (body, content_type, etag)
     
-    return web.Response(text="File not found", status=404)
+    body, content_type, etag = cached
+    if request.headers.get('If-None-Match') == etag:
+        return web.Response(status=304, headers={'ETag': etag})
+    
+    return web.Response(
+        body=body,
+        content_type=content_type,
+        headers={'ETag': etag}
+    )
 
 
 async def websocket_handler(request, agent):
     """Handle WebSocket connections"""
-    ws = WebSocketResponse()
+    # Audio frames don't compress, so don't negotiate permessage-deflate
+    ws = WebSocketResponse(compress=False)
     await ws.prepare(request)
     
+    # No userspace write buffering: drain() waits for bytes to reach the
+    # socket, so audio frames aren't queued behind earlier ones
+    if request.transport is not None:
+        request.transport.set_write_buffer_limits(high=0)
+    
     # Handle the WebSocket connection (this will run the async for loop)
     await agent.handle_browser_websocket(ws)
     
     return ws
 
 
+def _create_listen_sockets(host, port):
+    """Create one listening socket per address host resolves to (as TCPSite
+    does, e.g. both 127.0.0.1 and ::1 for localhost), with latency-oriented options"""
+    infos = socket.getaddrinfo(host or None, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE)
+    sockets = []
+    try:
+        # getaddrinfo can repeat an address; bind each one once
+        for family, sock_type, proto, _, address in dict.fromkeys(infos):
+            sock = socket.socket(family, sock_type, proto)
+            sockets.append(sock)
+            if os.name != 'nt':
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if family == socket.AF_INET6:
+                # Leave IPv4 to its own socket so "::" and "0.0.0.0" don't collide
+                sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 1)
+            # Accepted connections inherit TCP_NODELAY, so small control frames and
+            # audio chunks aren't held back by Nagle's algorithm
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # TCP keepalive well inside typical 30s NAT/load-balancer idle timeouts so
+            # long, quiet voice sessions stay up (interval options are platform-specific)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for option, value in (("TCP_KEEPIDLE", 20), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+                if hasattr(socket, option):
+                    sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+            sock.bind(address)
+            sock.listen(128)
+    except OSError:
+        for sock in sockets:
+            sock.close()
+        raise
+    return sockets
+
+
 async def init_unified_server(agent):
     """Start unified HTTP and WebSocket server on single port"""
     app = web.Application()
@@ -704,52 +1159,130 @@ async def init_unified_server(agent):
     # WebSocket endpoint
     app.router.add_get('/ws', lambda request: websocket_handler(request, agent))
     
+    # Browser handlers only return once their socket closes, so close them
+    # during shutdown rather than letting the runner wait for them
+    app.on_shutdown.append(lambda app: agent.close_browser_connections())
+    
     host = config.HOST
     port = config.PORT
     
     print(f"Web interface: http://{host}:{port}")
     print(f"WebSocket server: ws://{host}:{port}/ws")
     
-    runner = web.AppRunner(app)
+    # No per-request access log formatting; shutdown is driven by agent.stop_event
+    # and must finish well within docker stop's 10s grace period
+    runner = web.AppRunner(app, access_log=None, handle_signals=False, shutdown_timeout=2.0)
     await runner.setup()
-    site = web.TCPSite(runner, host, port)
-    await site.start()
+    for sock in _create_listen_sockets(host, port):
+        await web.SockSite(runner, sock).start()
     
-    await asyncio.Future()
+    try:
+        await agent.stop_event.wait()
+    finally:
+        # Close the listening socket and open connections before the caller
+        # tears down the agent's OpenAI connection
+        await runner.cleanup()
+
+
+def _write_banner(lines):
+    """Emit a block of startup lines with one write instead of a print per line"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 async def main():
     """Main entry point"""
     provider = "Azure OpenAI" if config.USE_AZURE else "OpenAI"
-    print("\n" + "=" * 70)
-    print(" " * 15 + "STS VOICE AGENT")
-    print(" " * 10 + f"(Speech-to-Speech with {provider} Realtime)")
-    print("=" * 70)
-    print("\n  Direct audio-to-audio processing - no separate STT/TTS")
-    print("=" * 70)
-    print()
+    _write_banner([
+        "",
+        "=" * 70,
+        " " * 15 + "STS VOICE AGENT",
+        " " * 10 + f"(Speech-to-Speech with {provider} Realtime)",
+        "=" * 70,
+        "",
+        "  Direct audio-to-audio processing - no separate STT/TTS",
+        "=" * 70,
+        "",
+    ])
     
     agent = STSVoiceAgent()
+    
+    # SIGINT (Ctrl-C) and SIGTERM (docker stop, systemd) both drain gracefully;
+    # a second signal cancels this task instead
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, agent.request_shutdown, asyncio.current_task())
+        except NotImplementedError:
+            # Windows event loops don't support signal handlers; Ctrl-C is
+            # handled by the KeyboardInterrupt fallback in __main__
+            pass
+    
     await agent.initialize()
     
-    print()
-    print("=" * 70)
-    print("All systems ready!")
-    print("Open http://localhost:8080 in your browser")
-    print("=" * 70)
-    print()
+    _write_banner([
+        "",
+        "=" * 70,
+        "All systems ready!",
+        "Open http://localhost:8080 in your browser",
+        "=" * 70,
+        "",
+    ])
     
     try:
         await init_unified_server(agent)
-    except KeyboardInterrupt:
-        print("\n\n🛑 Shutting down...")
     finally:
         await agent.cleanup()
+    print("\n👋 Goodbye!")
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues records as-is
+    
+    The stock prepare() formats and copies each record on the calling thread
+    (the event loop). That is only needed when records cross a process
+    boundary; with an in-process queue the listener thread can format them.
+    """
+    
+    def prepare(self, record):
+        return record
+
+
+def configure_logging():
+    """Route the "sts" logger to stdout at the level chosen by DEBUG/VERBOSE
+    
+    Records are handed to a QueueListener thread for formatting and writing,
+    so event-loop code never blocks on stdout. Returns the started listener;
+    call stop() on it at exit to flush pending records.
+    """
+    if CONFIG.verbose:
+        level = TRACE
+    elif CONFIG.debug:
+        level = logging.DEBUG
+    else:
+        level = logging.INFO
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(SimpleQueue(), handler)
+    logger.addHandler(_DeferredQueueHandler(listener.queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    listener.start()
+    return listener
 
 
 if __name__ == "__main__":
+    log_listener = configure_logging()
+    # libuv-based event loop for cheaper socket I/O (falls back to asyncio's default)
+    run = uvloop.run if uvloop is not None else asyncio.run
     try:
-        asyncio.run(main())
+        run(main())
     except KeyboardInterrupt:
+        # Only reached where loop signal handlers are unavailable (Windows)
         print("\n👋 Goodbye!")
+    except asyncio.CancelledError:
+        # Shutdown forced by a second SIGINT/SIGTERM
+        pass
+    finally:
+        log_listener.stop()
 